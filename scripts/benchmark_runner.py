@@ -4,55 +4,85 @@
 import subprocess
 import time
 import csv
+import asyncio
+import aiohttp
 import requests
-import concurrent.futures
-import statistics
-import os
-import yaml
+import numpy as np
 import sys
+from pathlib import Path
 
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+if uvloop is not None and sys.platform != "win32":
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+MOCK_SCRIPT_PATH = PROJECT_ROOT / "simulation" / "mock_servers.py"
 
 LB_URL = "http://localhost:8080"
-CONFIG_FILE = os.path.join(PROJECT_ROOT, "config.yaml")
-OUTPUT_FILE = os.path.join(PROJECT_ROOT, "results", "production_env_benchmarks.csv")
+RELOAD_URL = "http://localhost:8080/reload"
+HEALTH_URL = "http://localhost:8080/healthz"
+CONFIG_FILE = PROJECT_ROOT / "config.yaml"
+LB_BIN = PROJECT_ROOT / ("lb_bench.exe" if sys.platform == "win32" else "lb_bench")
+OUTPUT_FILE = PROJECT_ROOT / "results" / "production_env_benchmarks.csv"
 ALGORITHMS = ["round-robin", "least-connections", "weighted-round-robin", "least-response-time", "q-learning"]
 
 TOTAL_REQUESTS = 500
 CONCURRENCY = 10
 
+PORTS = [8081, 8082, 8083, 8084, 8085]
+
+_TEMPLATE = "port: 8080\nalgorithm: {algo}\nhealth_check_interval: {hc}\nbackends:\n" + "".join(
+    f"  - url: http://localhost:{p}\n    weight: 1\n" for p in PORTS
+)
+
 def write_config(algo):
-    config = {
-        "port": 8080,
-        "algorithm": algo,
-        "health_check_interval": "2s",
-        "backends": [
-            {"url": "http://localhost:8081", "weight": 1},
-            {"url": "http://localhost:8082", "weight": 1},
-            {"url": "http://localhost:8083", "weight": 1},
-            {"url": "http://localhost:8084", "weight": 1},
-            {"url": "http://localhost:8085", "weight": 1},
-        ]
-    }
-    with open(CONFIG_FILE, "w") as f:
-        yaml.dump(config, f)
+    CONFIG_FILE.write_text(_TEMPLATE.format(algo=algo, hc="2s"))
+
+def wait_ready(url, timeout=10):
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=0.2).status_code == 200:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+async def _fetch(session, sem, url):
+    loop = asyncio.get_running_loop()
+    async with sem:
+        t0 = loop.time()
+        async with session.get(url) as resp:
+            await resp.read()
+            return resp.status, (loop.time() - t0) * 1000
+
+async def _run(url, total, concurrency):
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=30)
+    sem = asyncio.Semaphore(concurrency)
+    async with aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar()) as session:
+        return await asyncio.gather(*[_fetch(session, sem, url) for _ in range(total)], return_exceptions=True)
 
 def run_load_test():
     latencies = []
     errors = 0
     start_time = time.time()
     
-    with concurrent.futures.ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
-        futures = [executor.submit(requests.get, LB_URL) for _ in range(TOTAL_REQUESTS)]
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                resp = future.result()
-                if resp.status_code != 200:
-                    errors += 1
-                latencies.append(resp.elapsed.total_seconds() * 1000)
-            except Exception:
-                errors += 1
+    for result in asyncio.run(_run(LB_URL, TOTAL_REQUESTS, CONCURRENCY)):
+        if isinstance(result, Exception):
+            errors += 1
+            continue
+        status, latency = result
+        if status != 200:
+            errors += 1
+        latencies.append(latency)
     
     duration = time.time() - start_time
     return latencies, errors, duration
@@ -60,43 +90,55 @@ def run_load_test():
 def main():
     print("Starting Production Environment Benchmark (All Features Enabled)...")
     
-    mock_script = os.path.join(PROJECT_ROOT, "simulation", "mock_servers.py")
+    print("Building Load Balancer...")
+    subprocess.check_call(["go", "build", "-o", LB_BIN, "main.go"], cwd=PROJECT_ROOT)
     
-    print(f"Starting Mock Servers ({mock_script})...")
+    print(f"Starting Mock Servers ({MOCK_SCRIPT_PATH})...")
     mock_process = subprocess.Popen(
-        ["python", mock_script],
+        ["python", MOCK_SCRIPT_PATH],
         stdout=subprocess.DEVNULL, 
         stderr=subprocess.DEVNULL,
         cwd=PROJECT_ROOT
     )
-    time.sleep(3) 
 
     results = []
     
     try:
-        for algo in ALGORITHMS:
-            print(f"\n---> Testing Algorithm: {algo}")
-            
-            write_config(algo)
-            
-            print("Starting Load Balancer...")
-            lb_process = subprocess.Popen(
-                ["go", "run", "main.go"],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                cwd=PROJECT_ROOT 
-            )
-            time.sleep(5) 
+        for port in PORTS:
+            wait_ready(f"http://localhost:{port}/healthz")
+        
+        write_config(ALGORITHMS[0])
+        
+        print("Starting Load Balancer...")
+        lb_process = subprocess.Popen(
+            [LB_BIN],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            cwd=PROJECT_ROOT 
+        )
+        
+        try:
+            wait_ready(HEALTH_URL)
             
-            print("Sending traffic...")
-            try:
+            for algo in ALGORITHMS:
+                print(f"\n---> Testing Algorithm: {algo}")
+                
+                if algo != ALGORITHMS[0]:
+                    write_config(algo)
+                    requests.get(RELOAD_URL).raise_for_status()
+                    time.sleep(0.5)
+                
+                print("Sending traffic...")
                 latencies, errors, duration = run_load_test()
                 
-                avg_lat = statistics.mean(latencies) if latencies else 0
-                p95 = statistics.quantiles(latencies, n=20)[18] if latencies else 0
+                avg_lat = p95 = p99 = 0
+                if latencies:
+                    arr = np.fromiter(latencies, dtype=np.float64, count=len(latencies))
+                    avg_lat = float(arr.mean())
+                    p95, p99 = (float(v) for v in np.percentile(arr, [95, 99]))
                 throughput = TOTAL_REQUESTS / duration
                 
-                print(f"Results: Avg={avg_lat:.2f}ms, P95={p95:.2f}ms, Err={errors}, RPS={throughput:.2f}")
+                print(f"Results: Avg={avg_lat:.2f}ms, P95={p95:.2f}ms, P99={p99:.2f}ms, Err={errors}, RPS={throughput:.2f}")
                 
                 results.append({
                     "Algorithm": algo,
@@ -105,15 +147,15 @@ def main():
                     "Throughput (Req/s)": round(throughput, 2),
                     "Avg Latency (ms)": round(avg_lat, 2),
                     "P95 Latency (ms)": round(p95, 2),
+                    "P99 Latency (ms)": round(p99, 2),
                     "Error Rate (%)": round((errors/TOTAL_REQUESTS)*100, 2)
                 })
-            finally:
-                lb_process.terminate()
-                try:
-                    lb_process.wait(timeout=2)
-                except subprocess.TimeoutExpired:
-                    lb_process.kill()
-                time.sleep(2)
+        finally:
+            lb_process.terminate()
+            try:
+                lb_process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                lb_process.kill()
 
     finally:
         print("Stopping Mock Servers...")
@@ -122,6 +164,7 @@ def main():
             mock_process.wait(timeout=2)
         except subprocess.TimeoutExpired:
             mock_process.kill()
+        LB_BIN.unlink(missing_ok=True)
 
     keys = results[0].keys()
     with open(OUTPUT_FILE, "w", newline="") as f:
@@ -129,7 +172,7 @@ def main():
         dict_writer.writeheader()
         dict_writer.writerows(results)
         
-    print(f"\nDone! Results saved to {os.path.abspath(OUTPUT_FILE)}")
+    print(f"\nDone! Results saved to {OUTPUT_FILE}")
 
 if __name__ == "__main__":
     main()
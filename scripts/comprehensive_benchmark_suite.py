@@ -4,30 +4,50 @@
 import subprocess
 import time
 import csv
+import asyncio
+import aiohttp
 import requests
 import concurrent.futures
-import statistics
+import contextlib
+import multiprocessing
+import numpy as np
 import os
-import yaml
 import sys
-import json
-from collections import defaultdict
+import orjson
+from pathlib import Path
 
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
-MOCK_CONFIG_PATH = os.path.join(PROJECT_ROOT, "simulation", "mock_config.json")
-MOCK_SCRIPT_PATH = os.path.join(PROJECT_ROOT, "simulation", "mock_servers.py")
-LB_URL = "http://localhost:8080"
-CONFIG_FILE = os.path.join(PROJECT_ROOT, "config.yaml")
-FINAL_OUTPUT_FILE = os.path.join(PROJECT_ROOT, "results", "comprehensive_suite_results.csv")
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+if uvloop is not None and sys.platform != "win32":
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from simulation.mock_servers import start_all
+
+SIMULATION_DIR = PROJECT_ROOT / "simulation"
+LB_BIN = PROJECT_ROOT / ("lb_bench.exe" if sys.platform == "win32" else "lb_bench")
+FINAL_OUTPUT_FILE = PROJECT_ROOT / "results" / "comprehensive_suite_results.csv"
+RAW_OUTPUT_FILE = PROJECT_ROOT / "results" / "comprehensive_suite_raw.csv"
 
 ALGORITHMS = ["round-robin", "least-connections", "weighted-round-robin", "least-response-time", "q-learning"]
 
 
+LB_PORT = 8080
 PORTS = [8081, 8082, 8083, 8084, 8085]
+SHARD_PORT_STRIDE = 100
+SHARDS = int(os.environ.get("BENCH_SHARDS", "1"))
 REQUESTS_PER_ALGO = 200 
 CONCURRENCY = 10
 
+SUMMARY_HEADERS = ["Algorithm", "Avg_RPS", "Avg_Latency", "Avg_Error_Rate"]
+RAW_HEADERS = ["Scenario", "Algorithm", "RPS", "Latency", "Error_Rate"]
+
 SCENARIOS = {
     "Baseline": [
         {"port": p, "latency": 0.010, "jitter": 0.002, "fail_rate": 0.0, "name": f"Base_{i}"} for i, p in enumerate(PORTS)
@@ -108,137 +128,181 @@ SCENARIOS = {
     ],
 }
 
-def write_lb_config(algo):
-    config = {
-        "port": 8080,
-        "algorithm": algo,
-        "health_check_interval": "1s",
-        "backends": [{"url": f"http://localhost:{p}", "weight": 1} for p in PORTS]
-    }
-    with open(CONFIG_FILE, "w") as f:
-        yaml.dump(config, f)
-
-def run_test():
+def lb_config_template(offset):
+    return f"port: {LB_PORT + offset}\nalgorithm: {{algo}}\nhealth_check_interval: {{hc}}\nbackends:\n" + "".join(
+        f"  - url: http://localhost:{p + offset}\n    weight: 1\n" for p in PORTS
+    )
+
+def write_lb_config(config_file, template, algo):
+    config_file.write_text(template.format(algo=algo, hc="1s"))
+
+def wait_ready(url, timeout=10):
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=0.2).status_code == 200:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+async def _fetch(session, sem, url):
+    loop = asyncio.get_running_loop()
+    async with sem:
+        t0 = loop.time()
+        async with session.get(url) as resp:
+            await resp.read()
+            return resp.status, (loop.time() - t0) * 1000
+
+async def _run(url, total, concurrency):
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=30)
+    sem = asyncio.Semaphore(concurrency)
+    async with aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar()) as session:
+        return await asyncio.gather(*[_fetch(session, sem, url) for _ in range(total)], return_exceptions=True)
+
+def run_test(lb_url):
     latencies = []
     errors = 0
     start = time.time()
-    with concurrent.futures.ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
-        futures = [executor.submit(requests.get, LB_URL) for _ in range(REQUESTS_PER_ALGO)]
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                resp = future.result()
-                if resp.status_code != 200: errors += 1
-                latencies.append(resp.elapsed.total_seconds() * 1000)
-            except:
-                errors += 1
+    for result in asyncio.run(_run(lb_url, REQUESTS_PER_ALGO, CONCURRENCY)):
+        if isinstance(result, Exception):
+            errors += 1
+            continue
+        status, latency = result
+        if status != 200: errors += 1
+        latencies.append(latency)
     duration = time.time() - start
     return latencies, errors, duration
 
-def main():
-    print(f"Starting Comprehensive Benchmark Suite (10 Scenarios x 5 Algos)...")
-    
-    overall_results = []
-    
-    scenario_names = list(SCENARIOS.keys())
-    
-    for i, scenario_name in enumerate(scenario_names):
-        print(f"\n\n=== Scenario {i+1}/10: {scenario_name} ===")
-        
-        
-        servers = SCENARIOS[scenario_name]
-        with open(MOCK_CONFIG_PATH, "w") as f:
-            json.dump(servers, f, indent=2)
-            
-        
-        print("  Running Mock Servers...")
-        
-        
-        
-        
-        time.sleep(1)
-        
-        
-        
-        mock_proc = subprocess.Popen(["python", MOCK_SCRIPT_PATH], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=PROJECT_ROOT)
-        time.sleep(2)
+def write_mock_config(mock_config_path, scenario_name, offset):
+    servers = [dict(conf, port=conf["port"] + offset) for conf in SCENARIOS[scenario_name]]
+    mock_config_path.write_bytes(orjson.dumps(servers, option=orjson.OPT_INDENT_2))
+    return servers
+
+def run_scenario(shard_id, scenario_name):
+    offset = SHARD_PORT_STRIDE * shard_id
+    lb_url = f"http://localhost:{LB_PORT + offset}"
+    config_file = PROJECT_ROOT / f"config_shard{shard_id}.yaml"
+    template = lb_config_template(offset)
+    results = []
+
+    write_lb_config(config_file, template, ALGORITHMS[0])
+    lb_proc = subprocess.Popen([LB_BIN, "-config", config_file], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=PROJECT_ROOT)
+    try:
+        wait_ready(f"{lb_url}/healthz")
         
         for algo in ALGORITHMS:
-            print(f"  Testing {algo}...", end="", flush=True)
-            write_lb_config(algo)
-            
+            if algo != ALGORITHMS[0]:
+                write_lb_config(config_file, template, algo)
+                requests.get(f"{lb_url}/reload").raise_for_status()
+                time.sleep(0.5)
             
-            lb_proc = subprocess.Popen(["go", "run", "main.go"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=PROJECT_ROOT)
-            time.sleep(3)
+            lats, errs, dur = run_test(lb_url)
+            rps = REQUESTS_PER_ALGO / dur
+            avg_lat = float(np.mean(lats)) if lats else 0
+            err_rate = (errs / REQUESTS_PER_ALGO) * 100
             
-            try:
-                lats, errs, dur = run_test()
-                rps = REQUESTS_PER_ALGO / dur
-                avg_lat = statistics.mean(lats) if lats else 0
-                err_rate = (errs / REQUESTS_PER_ALGO) * 100
-                
-                result = {
-                    "Scenario": scenario_name,
-                    "Algorithm": algo,
-                    "RPS": round(rps, 2),
-                    "Latency": round(avg_lat, 2),
-                    "Error_Rate": round(err_rate, 2)
-                }
-                overall_results.append(result)
-                print(f" Done. RPS={result['RPS']}, Lat={result['Latency']}ms")
-                
-            finally:
-                lb_proc.terminate()
-                try: lb_proc.wait(timeout=2)
-                except: lb_proc.kill()
-        
+            results.append((scenario_name, algo, round(rps, 2), round(avg_lat, 2), round(err_rate, 2)))
+            print(f"  [{scenario_name}] {algo} done. RPS={round(rps, 2)}, Lat={round(avg_lat, 2)}ms")
+    finally:
+        lb_proc.terminate()
+        try: lb_proc.wait(timeout=2)
+        except: lb_proc.kill()
+        config_file.unlink(missing_ok=True)
+
+    return results
+
+def start_mocks_quietly(servers, config_path):
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        start_all(servers, config_path)
+
+def run_shard(shard_id, scenario_names):
+    offset = SHARD_PORT_STRIDE * shard_id
+    mock_config_path = SIMULATION_DIR / f"mock_config_shard{shard_id}.json"
+    admin_url = f"http://localhost:{PORTS[0] + offset}/admin/reload"
+    results = []
+
+    servers = write_mock_config(mock_config_path, scenario_names[0], offset)
+    print(f"  [shard {shard_id}] Running Mock Servers...")
+    mock_proc = multiprocessing.get_context("spawn").Process(target=start_mocks_quietly, args=(servers, mock_config_path), daemon=True)
+    mock_proc.start()
+    try:
+        for conf in servers:
+            wait_ready(f"http://localhost:{conf['port']}/healthz")
         
-        mock_proc.terminate()
-        try: mock_proc.wait(timeout=2)
-        except: mock_proc.kill()
+        for scenario_name in scenario_names:
+            if scenario_name != scenario_names[0]:
+                write_mock_config(mock_config_path, scenario_name, offset)
+                requests.post(admin_url).raise_for_status()
+            print(f"  [{scenario_name}] Running on shard {shard_id}...")
+            results.extend(run_scenario(shard_id, scenario_name))
+    finally:
+        mock_proc.kill()
+        mock_proc.join()
+        mock_config_path.unlink(missing_ok=True)
+
+    return results
 
+def main():
+    overall_results = []
+    
+    scenario_names = list(SCENARIOS.keys())
+    algo_index = {algo: i for i, algo in enumerate(ALGORITHMS)}
+    scenario_index = {name: j for j, name in enumerate(scenario_names)}
+    rps = np.zeros((len(ALGORITHMS), len(scenario_names)))
+    lat = np.zeros_like(rps)
+    err = np.zeros_like(rps)
+    workers = max(1, min(SHARDS, len(scenario_names)))
+    
+    print(f"Starting Comprehensive Benchmark Suite ({len(scenario_names)} Scenarios x {len(ALGORITHMS)} Algos, {workers} shards)...")
+    
+    print("Building Load Balancer...")
+    subprocess.check_call(["go", "build", "-o", LB_BIN, "main.go"], cwd=PROJECT_ROOT)
     
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_shard, k, scenario_names[k::workers]) for k in range(workers)]
+            for future in futures:
+                for row in future.result():
+                    i, j = algo_index[row[1]], scenario_index[row[0]]
+                    rps[i, j], lat[i, j], err[i, j] = row[2:]
+                    overall_results.append(row)
+    finally:
+        LB_BIN.unlink(missing_ok=True)
+
+    overall_results.sort(key=lambda r: (scenario_index[r[0]], algo_index[r[1]]))
+
     print("\n\n=== AGGREGATING RESULTS ===")
     
-    headers = ["Algorithm", "Avg_RPS", "Avg_Latency", "Avg_Error_Rate"]
-    algo_stats = defaultdict(lambda: {"rps": [], "lat": [], "err": []})
+    avg_rps = rps.mean(axis=1)
+    avg_lat = lat.mean(axis=1)
+    avg_err = err.mean(axis=1)
     
-    for r in overall_results:
-        a = r["Algorithm"]
-        algo_stats[a]["rps"].append(r["RPS"])
-        algo_stats[a]["lat"].append(r["Latency"])
-        algo_stats[a]["err"].append(r["Error_Rate"])
-        
-    final_summary = []
-    for algo in ALGORITHMS:
-        stats = algo_stats[algo]
-        final_summary.append({
-            "Algorithm": algo,
-            "Avg_RPS": round(statistics.mean(stats["rps"]), 2),
-            "Avg_Latency": round(statistics.mean(stats["lat"]), 2),
-            "Avg_Error_Rate": round(statistics.mean(stats["err"]), 2)
-        })
-        
-    final_summary.sort(key=lambda x: x["Avg_RPS"], reverse=True)
+    final_summary = [
+        (ALGORITHMS[i], round(float(avg_rps[i]), 2), round(float(avg_lat[i]), 2), round(float(avg_err[i]), 2))
+        for i in np.argsort(-avg_rps, kind="stable")
+    ]
     
     with open(FINAL_OUTPUT_FILE, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
-        writer.writeheader()
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_HEADERS)
         writer.writerows(final_summary)
         
-    
-    raw_path = os.path.join(PROJECT_ROOT, "results", "comprehensive_suite_raw.csv")
-    with open(raw_path, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=overall_results[0].keys())
-        writer.writeheader()
+    with open(RAW_OUTPUT_FILE, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(RAW_HEADERS)
         writer.writerows(overall_results)
         
     print(f"\nFinal Summary saved to {FINAL_OUTPUT_FILE}")
-    print(f"Raw Data saved to {raw_path}")
+    print(f"Raw Data saved to {RAW_OUTPUT_FILE}")
     
     print("\nAlgorithm | Avg RPS | Avg Latency | Avg Error %")
     print("-" * 50)
-    for r in final_summary:
-        print(f"{r['Algorithm']:<10} | {r['Avg_RPS']:<7} | {r['Avg_Latency']:<11} | {r['Avg_Error_Rate']}")
+    for algo, algo_rps, algo_lat, algo_err in final_summary:
+        print(f"{algo:<10} | {algo_rps:<7} | {algo_lat:<11} | {algo_err}")
 
 if __name__ == "__main__":
     main()
@@ -4,36 +4,62 @@
 import subprocess
 import time
 import requests
-import concurrent.futures
-import statistics
-import os
-import yaml
+import asyncio
+import aiohttp
+import numpy as np
 import csv
 import sys
+from pathlib import Path
 
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+if uvloop is not None and sys.platform != "win32":
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+MOCK_SCRIPT_PATH = PROJECT_ROOT / "simulation" / "mock_servers.py"
 
 LB_URL = "http://localhost:8080"
 RELOAD_URL = "http://localhost:8080/reload"
-CONFIG_FILE = os.path.join(PROJECT_ROOT, "config.yaml")
-OUTPUT_FILE = os.path.join(PROJECT_ROOT, "results", "comprehensive_results.csv")
+HEALTH_URL = "http://localhost:8080/healthz"
+CONFIG_FILE = PROJECT_ROOT / "config.yaml"
+OUTPUT_FILE = PROJECT_ROOT / "results" / "comprehensive_results.csv"
+
+PORTS = [8081, 8082, 8083, 8084, 8085]
+
+_TEMPLATE = "port: 8080\nalgorithm: {algo}\nhealth_check_interval: {hc}\nbackends:\n" + "".join(
+    f"  - url: http://localhost:{p}\n    weight: 1\n" for p in PORTS
+)
 
 def write_config(algo):
-    config = {
-        "port": 8080,
-        "algorithm": algo,
-        "health_check_interval": "1s",
-        "backends": [
-            {"url": "http://localhost:8081", "weight": 1},
-            {"url": "http://localhost:8082", "weight": 1},
-            {"url": "http://localhost:8083", "weight": 1},
-            {"url": "http://localhost:8084", "weight": 1},
-            {"url": "http://localhost:8085", "weight": 1},
-        ]
-    }
-    with open(CONFIG_FILE, "w") as f:
-        yaml.dump(config, f)
+    CONFIG_FILE.write_text(_TEMPLATE.format(algo=algo, hc="1s"))
+
+def wait_ready(url, timeout=10):
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=0.2).status_code == 200:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+async def _status(session):
+    async with session.get(LB_URL) as resp:
+        await resp.read()
+        return resp.status
+
+async def blast(n):
+    connector = aiohttp.TCPConnector(limit=200, limit_per_host=200)
+    async with aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar()) as session:
+        return await asyncio.gather(*[_status(session) for _ in range(n)], return_exceptions=True)
 
 def test_rate_limiting():
     print("Testing Rate Limiter...")
@@ -42,21 +68,32 @@ def test_rate_limiting():
     total = 1200
     start = time.time()
     
-    with concurrent.futures.ThreadPoolExecutor(max_workers=50) as executor:
-        futures = [executor.submit(requests.get, LB_URL) for _ in range(total)]
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                if future.result().status_code == 429:
-                    blocked += 1
-                else:
-                    success += 1
-            except Exception as e:
-                print(f"Request failed: {e}")
-                pass
+    for result in asyncio.run(blast(total)):
+        if isinstance(result, Exception):
+            print(f"Request failed: {result}")
+            continue
+        if result == 429:
+            blocked += 1
+        else:
+            success += 1
                 
     print(f"Rate Limit Results: Success={success}, Blocked={blocked}")
     return blocked
 
+async def _fetch(session, sem, url):
+    loop = asyncio.get_running_loop()
+    async with sem:
+        t0 = loop.time()
+        async with session.get(url) as resp:
+            await resp.read()
+            return resp.status, (loop.time() - t0) * 1000
+
+async def _run(url, total, concurrency):
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=30)
+    sem = asyncio.Semaphore(concurrency)
+    async with aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar()) as session:
+        return await asyncio.gather(*[_fetch(session, sem, url) for _ in range(total)], return_exceptions=True)
+
 def measure_performance(name):
     latencies = []
     errors = 0
@@ -64,23 +101,24 @@ def measure_performance(name):
     total = 500
     start = time.time()
     
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        futures = [executor.submit(requests.get, LB_URL) for _ in range(total)]
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                resp = future.result()
-                if resp.status_code == 429:
-                    blocked += 1
-                    errors += 1
-                elif resp.status_code != 200:
-                    errors += 1
-                latencies.append(resp.elapsed.total_seconds() * 1000)
-            except:
-                errors += 1
+    for result in asyncio.run(_run(LB_URL, total, 10)):
+        if isinstance(result, Exception):
+            errors += 1
+            continue
+        status, latency = result
+        if status == 429:
+            blocked += 1
+            errors += 1
+        elif status != 200:
+            errors += 1
+        latencies.append(latency)
                 
     duration = time.time() - start
-    avg = statistics.mean(latencies) if latencies else 0
-    p95 = statistics.quantiles(latencies, n=20)[18] if latencies else 0
+    avg = p95 = p99 = 0
+    if latencies:
+        arr = np.fromiter(latencies, dtype=np.float64, count=len(latencies))
+        avg = float(arr.mean())
+        p95, p99 = (float(v) for v in np.percentile(arr, [95, 99]))
     rps = total / duration
     
     return {
@@ -88,6 +126,7 @@ def measure_performance(name):
         "RPS": round(rps, 2),
         "Avg_Latency": round(avg, 2),
         "P95_Latency": round(p95, 2),
+        "P99_Latency": round(p99, 2),
         "Error_Rate": round((errors/total)*100, 2),
         "Blocked_Requests": blocked
     }
@@ -95,16 +134,17 @@ def measure_performance(name):
 def main():
     results = []
     
-    mock_script = os.path.join(PROJECT_ROOT, "simulation", "mock_servers.py")
     mock_proc = subprocess.Popen(
-        ["python", mock_script], 
+        ["python", MOCK_SCRIPT_PATH], 
         stdout=subprocess.DEVNULL, 
         stderr=subprocess.DEVNULL,
         cwd=PROJECT_ROOT
     )
-    time.sleep(2)
     
     try:
+        for port in PORTS:
+            wait_ready(f"http://localhost:{port}/healthz")
+        
         write_config("round-robin")
         lb_proc = subprocess.Popen(
             ["go", "run", "main.go"],
@@ -112,12 +152,12 @@ def main():
             stderr=subprocess.DEVNULL,
             cwd=PROJECT_ROOT
         )
-        time.sleep(5)
+        wait_ready(HEALTH_URL)
         
         limit_blocked_count = test_rate_limiting()
         results.append({
             "Test": "Rate_Limiter_Check",
-            "RPS": 0, "Avg_Latency": 0, "P95_Latency": 0,
+            "RPS": 0, "Avg_Latency": 0, "P95_Latency": 0, "P99_Latency": 0,
             "Error_Rate": 0,
             "Blocked_Requests": limit_blocked_count
         })
@@ -1,10 +1,30 @@
 import subprocess
 import time
-import requests
+import http.client
+import contextlib
+import urllib.parse
 import sys
 import os
 import signal
 
+def wait_ready(url, timeout=10):
+    parts = urllib.parse.urlsplit(url)
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=0.2)
+        try:
+            conn.request("GET", parts.path or "/")
+            if conn.getresponse().status == 200:
+                return
+        except (OSError, http.client.HTTPException):
+            pass
+        finally:
+            conn.close()
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
 def run_verification():
     print(">>> Starting E2E Feature Verification")
     
@@ -22,7 +42,12 @@ def run_verification():
         stderr=subprocess.PIPE,
         cwd=PROJECT_ROOT
     )
-    time.sleep(2)
+    try:
+        for port in (8081, 8082, 8083, 8084, 8085):
+            wait_ready(f"http://localhost:{port}/healthz")
+    except RuntimeError:
+        mock_server_process.terminate()
+        raise
 
     print(f">>> Starting Load Balancer from {LB_EXE}...")
     if not os.path.exists(LB_EXE):
@@ -35,51 +60,60 @@ def run_verification():
         stderr=subprocess.PIPE,
         cwd=PROJECT_ROOT
     )
-    time.sleep(3)
 
     failures = []
 
     try:
-        try:
-            resp = requests.get("http://localhost:8080/healthz")
-            if resp.status_code == 200 and resp.text == "ok":
-                print("PASS: /healthz endpoint")
-            else:
-                failures.append(f"FAIL: /healthz returned {resp.status_code} {resp.text}")
-        except Exception as e:
-            failures.append(f"FAIL: /healthz exception: {e}")
+        wait_ready("http://localhost:8080/healthz")
 
-        try:
-            resp = requests.get("http://localhost:8080/")
+        with contextlib.closing(http.client.HTTPConnection("localhost", 8080, timeout=5)) as conn:
+            try:
+                conn.request("GET", "/healthz")
+                resp = conn.getresponse()
+                body = resp.read().decode("utf-8", errors="ignore")
+                if resp.status == 200 and body == "ok":
+                    print("PASS: /healthz endpoint")
+                else:
+                    failures.append(f"FAIL: /healthz returned {resp.status} {body}")
+            except Exception as e:
+                conn.close()
+                failures.append(f"FAIL: /healthz exception: {e}")
+
+            try:
+                conn.request("GET", "/")
+                resp = conn.getresponse()
+                resp.read()
             
-            if resp.status_code == 200:
-                print("PASS: Basic routing")
-            else:
-                failures.append(f"FAIL: Basic routing status {resp.status_code}")
-
-            headers = resp.headers
-            if "X-Request-ID" in headers:
-                print(f"PASS: X-Request-ID found ({headers['X-Request-ID']})")
-            else:
-                failures.append("FAIL: X-Request-ID missing")
-
-            if "Strict-Transport-Security" in headers:
-                print("PASS: Security Headers (HSTS) found")
-            else:
-                failures.append("FAIL: Security Headers missing")
+                if resp.status == 200:
+                    print("PASS: Basic routing")
+                else:
+                    failures.append(f"FAIL: Basic routing status {resp.status}")
+
+                headers = resp.headers
+                if "X-Request-ID" in headers:
+                    print(f"PASS: X-Request-ID found ({headers['X-Request-ID']})")
+                else:
+                    failures.append("FAIL: X-Request-ID missing")
+
+                if "Strict-Transport-Security" in headers:
+                    print("PASS: Security Headers (HSTS) found")
+                else:
+                    failures.append("FAIL: Security Headers missing")
                 
-        except Exception as e:
-            failures.append(f"FAIL: Basic Request exception: {e}")
+            except Exception as e:
+                conn.close()
+                failures.append(f"FAIL: Basic Request exception: {e}")
 
-        try:
-            headers = {"Accept-Encoding": "gzip"}
-            resp = requests.get("http://localhost:8080/", headers=headers)
-            if "gzip" in resp.headers.get("Content-Encoding", ""):
-                print("PASS: Gzip Compression working")
-            else:
-                failures.append(f"FAIL: Gzip not applied. Content-Encoding: {resp.headers.get('Content-Encoding')}")
-        except Exception as e:
-            failures.append(f"FAIL: Gzip exception: {e}")
+            try:
+                conn.request("GET", "/", headers={"Accept-Encoding": "gzip"})
+                resp = conn.getresponse()
+                resp.read()
+                if "gzip" in resp.headers.get("Content-Encoding", ""):
+                    print("PASS: Gzip Compression working")
+                else:
+                    failures.append(f"FAIL: Gzip not applied. Content-Encoding: {resp.headers.get('Content-Encoding')}")
+            except Exception as e:
+                failures.append(f"FAIL: Gzip exception: {e}")
 
     finally:
         print("\n>>> LB Output Log:")
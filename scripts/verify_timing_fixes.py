@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 
+import http.cookiejar
 import requests
-import time
-import statistics
+import numpy as np
 
 LB_URL = "http://localhost:8080"
 NUM_REQUESTS = 20
@@ -16,29 +16,34 @@ def test_timing_fix():
     
     print(f"\nSending {NUM_REQUESTS} requests to load balancer...")
     
-    for i in range(NUM_REQUESTS):
-        try:
-            start = time.time()
-            resp = requests.get(LB_URL, timeout=5)
-            duration_ms = (time.time() - start) * 1000
-            latencies.append(duration_ms)
-            
-            status = "✓" if resp.status_code == 200 else "✗"
-            print(f"  Request {i+1:2d}: {status} {resp.status_code} - {duration_ms:.2f}ms")
-            
-        except Exception as e:
-            print(f"  Request {i+1:2d}: ✗ ERROR - {e}")
+    with requests.Session() as session:
+        session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        for i in range(NUM_REQUESTS):
+            try:
+                resp = session.get(LB_URL, timeout=5)
+                duration_ms = resp.elapsed.total_seconds() * 1000
+                latencies.append(duration_ms)
+                
+                status = "✓" if resp.status_code == 200 else "✗"
+                print(f"  Request {i+1:2d}: {status} {resp.status_code} - {duration_ms:.2f}ms")
+                
+            except Exception as e:
+                print(f"  Request {i+1:2d}: ✗ ERROR - {e}")
     
     if latencies:
-        avg = statistics.mean(latencies)
-        min_lat = min(latencies)
-        max_lat = max(latencies)
+        arr = np.fromiter(latencies, dtype=np.float64, count=len(latencies))
+        avg = float(arr.mean())
+        min_lat = float(arr.min())
+        max_lat = float(arr.max())
+        p95, p99 = (float(v) for v in np.percentile(arr, [95, 99]))
         
         print(f"\n{'Results':^60}")
         print("-" * 60)
         print(f"  Average Latency: {avg:.2f}ms")
         print(f"  Min Latency:     {min_lat:.2f}ms")
         print(f"  Max Latency:     {max_lat:.2f}ms")
+        print(f"  P95 Latency:     {p95:.2f}ms")
+        print(f"  P99 Latency:     {p99:.2f}ms")
         print(f"  Total Requests:  {len(latencies)}")
         
         if avg > 1.0:
@@ -1,12 +1,16 @@
 
-import http.server
-import socketserver
-import time
+import asyncio
 import random
-import threading
 import sys
-import json
-import os
+import orjson
+from pathlib import Path
+
+from aiohttp import web
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 DEFAULT_SERVERS = [
     {"port": 8081, "latency": 0.005, "jitter": 0.001, "fail_rate": 0.00, "name": "GOLDEN"},
@@ -16,60 +20,93 @@ DEFAULT_SERVERS = [
     {"port": 8085, "latency": 0.150, "jitter": 0.100, "fail_rate": 0.10, "name": "CHAOS"},
 ]
 
-SERVERS = DEFAULT_SERVERS
-CONFIG_PATH = os.path.join(os.path.dirname(__file__), "mock_config.json")
+BACKENDS = {}
+CONFIG_PATH = Path(__file__).resolve().parent / "mock_config.json"
 
-if os.path.exists(CONFIG_PATH):
-    try:
-        with open(CONFIG_PATH, "r") as f:
-            SERVERS = json.load(f)
-            print(f"Loaded config from {CONFIG_PATH}")
-    except Exception as e:
-        print(f"Failed to load config: {e}")
+def load_config(config_path):
+    if config_path.exists():
+        try:
+            servers = orjson.loads(config_path.read_bytes())
+            print(f"Loaded config from {config_path}")
+            return servers
+        except Exception as e:
+            print(f"Failed to load config: {e}")
+    return DEFAULT_SERVERS
+
+class MockBackend:
+    def __init__(self, config):
+        self.config = config
+        self.rng = random.Random()
 
-class MockHandler(http.server.BaseHTTPRequestHandler):
-    def do_GET(self):
-        server_conf = self.server.config
+    async def healthz(self, request):
+        return web.Response(text="ok")
+
+    async def handle(self, request):
+        server_conf = self.config
+        rng = self.rng
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(0.0, server_conf["latency"] + rng.uniform(-server_conf["jitter"], server_conf["jitter"]))
         
-        if random.random() < server_conf["fail_rate"]:
-            self.send_response(500)
-            self.end_headers()
-            self.wfile.write(b"Internal Server Error")
-            return
-
-        delay = server_conf["latency"] + random.uniform(-server_conf["jitter"], server_conf["jitter"])
-        if delay < 0: delay = 0
-        time.sleep(delay)
+        if rng.random() < server_conf["fail_rate"]:
+            return web.Response(status=500, text="Internal Server Error")
+
+        await asyncio.sleep(max(0.0, deadline - loop.time()))
         
-        self.send_response(200)
-        self.send_header('Content-type', 'text/plain')
-        self.end_headers()
-        self.wfile.write(f"Response from {server_conf['name']} on port {server_conf['port']}".encode())
-    
-    def log_message(self, format, *args):
-        pass
-
-class ThreadingSimpleServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
-    pass
-
-def run_server(conf):
-    port = conf["port"]
-    handler = MockHandler
-    with ThreadingSimpleServer(("", port), handler) as httpd:
-        httpd.config = conf
-        print(f"Starting {conf['name']} server on port {port}")
-        httpd.serve_forever()
+        return web.Response(text=f"Response from {server_conf['name']} on port {server_conf['port']}")
+
+async def admin_reload(request):
+    try:
+        servers = orjson.loads(CONFIG_PATH.read_bytes())
+    except Exception as e:
+        return web.Response(status=500, text=f"Failed to load config: {e}")
+
+    unknown = [conf["port"] for conf in servers if conf["port"] not in BACKENDS]
+    if unknown:
+        return web.Response(status=400, text=f"Unknown ports: {unknown}")
+
+    for conf in servers:
+        BACKENDS[conf["port"]].config = conf
+    print(f"Reloaded config from {CONFIG_PATH}")
+    return web.Response(text="Configuration reloaded")
+
+def make_app(conf):
+    app = web.Application()
+    backend = MockBackend(conf)
+    BACKENDS[conf["port"]] = backend
+    app.router.add_get("/healthz", backend.healthz)
+    app.router.add_post("/admin/reload", admin_reload)
+    app.router.add_get("/{tail:.*}", backend.handle)
+    return app
+
+async def serve(servers):
+    runners = []
+    try:
+        for conf in servers:
+            runner = web.AppRunner(make_app(conf), access_log=None)
+            await runner.setup()
+            await web.TCPSite(runner, port=conf["port"]).start()
+            runners.append(runner)
+            print(f"Starting {conf['name']} server on port {conf['port']}")
+        await asyncio.Event().wait()
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+def start_all(servers, config_path=None):
+    global CONFIG_PATH
+    if config_path is not None:
+        CONFIG_PATH = Path(config_path)
+
+    if uvloop is not None and sys.platform != "win32":
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
-if __name__ == "__main__":
-    threads = []
     print("Starting mock backend servers...")
-    for conf in SERVERS:
-        t = threading.Thread(target=run_server, args=(conf,), daemon=True)
-        t.start()
-        threads.append(t)
-    
     try:
-        while True:
-            time.sleep(1)
+        asyncio.run(serve(servers))
     except KeyboardInterrupt:
         print("Stopping servers...")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        CONFIG_PATH = Path(sys.argv[1])
+    start_all(load_config(CONFIG_PATH))